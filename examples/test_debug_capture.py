@@ -39,10 +39,10 @@ print(f"Captured {len(captured_output)} items:")
 for i, item in enumerate(captured_output):
     print(f"  {i+1}. {repr(item)}")
 
-# Verify - the print() calls each create a newline, so we get 4 items total
-assert len(captured_output) == 4, f"Expected 4 items, got {len(captured_output)}"
+# Verify - each print()'s text and newline are coalesced, so we get 2 items total
+assert len(captured_output) == 2, f"Expected 2 items, got {len(captured_output)}"
 assert "This should be captured" in captured_output[0], f"Expected stdout to be captured"
-assert "Another captured message" in captured_output[2], f"Expected stdout to be captured"
+assert "Another captured message" in captured_output[1], f"Expected stdout to be captured"
 assert all("DEBUG" not in str(item) for item in captured_output), "DEBUG messages should NOT be captured"
 
 print("\n✓ Test passed: debug messages written to original_stderr are not captured")
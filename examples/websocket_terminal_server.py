@@ -8,6 +8,11 @@ WebSocket server for streaming terminal output to web clients.
 
 This server broadcasts terminal output from MQTT sensor examples to connected
 web clients via WebSocket, maintaining the terminal charm and formatting.
+
+If uvloop is installed (pip install uvloop), the server runs on the libuv
+event loop instead of asyncio's default selector loop, which lowers the
+per-send overhead when broadcasting to many clients. Without it the server
+falls back to the standard asyncio loop.
 """
 
 import argparse
@@ -18,7 +23,7 @@ import sys
 import threading
 import traceback
 from pathlib import Path
-from typing import Set
+from typing import Any, Dict, Optional, Set
 
 try:
     import websockets
@@ -34,14 +39,33 @@ except ImportError:
     print("=" * 60 + "\n")
     sys.exit(1)
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 # Add repository root to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from terminal_streamer import TerminalStreamer
 
+# Fixed protocol messages, encoded once instead of per connection/ping
+WELCOME_MESSAGE = json.dumps({
+    "type": "info",
+    "data": "Connected to MQTT Terminal Streamer"
+})
+PONG_MESSAGE = json.dumps({"type": "pong"})
+
 
 class WebSocketTerminalServer:
     """WebSocket server that broadcasts terminal output to connected clients"""
+
+    # Upper bound on client sends in flight at once across all clients
+    MAX_CONCURRENT_SENDS = 100
+    # Seconds a client gets to accept a message before it is dropped
+    SEND_TIMEOUT = 5.0
+    # Messages buffered per client; a slow client loses its oldest ones
+    CLIENT_QUEUE_SIZE = 256
     
     def __init__(self, host: str = "localhost", port: int = 8765, debug: bool = False):
         """
@@ -57,7 +81,11 @@ class WebSocketTerminalServer:
         self.clients: Set[websockets.WebSocketServerProtocol] = set()
         self.streamer = TerminalStreamer()
         self.streamer.register_callback(self._broadcast_to_clients)
-        self._broadcast_lock = asyncio.Lock()
+        # Outbound queue and sender task per client, see _register_client
+        self._client_queues: Dict[Any, asyncio.Queue] = {}
+        self._sender_tasks: Dict[Any, asyncio.Task] = {}
+        # Created with the first client so it belongs to the running loop
+        self._send_semaphore: Optional[asyncio.Semaphore] = None
         self.loop = None  # Will be set when server starts
         self._broadcast_count = 0  # Track number of broadcasts
     
@@ -94,45 +122,111 @@ class WebSocketTerminalServer:
             if len(text) < 100:
                 debug_print(f"[DEBUG] Content: {repr(text)}")
         
-        # Create a message with the text
+        # Encode once; every client's queue shares the same string
         message = json.dumps({
             "type": "output",
             "data": text
         })
         
-        # Schedule broadcast in the event loop from another thread
-        asyncio.run_coroutine_threadsafe(self._async_broadcast(message), self.loop)
+        # Hand the message to the event loop from the capture thread
+        self.loop.call_soon_threadsafe(self._enqueue_broadcast, message)
     
-    async def _async_broadcast(self, message: str) -> None:
+    def _enqueue_broadcast(self, message: str) -> None:
         """
-        Asynchronously broadcast a message to all clients.
+        Queue a message for every connected client.
+        Must run on the server's event loop.
         
         :param message: The message to broadcast
         """
-        if not self.clients:
-            return
+        for queue in self._client_queues.values():
+            self._put_drop_oldest(queue, message)
+    
+    @staticmethod
+    def _put_drop_oldest(queue: asyncio.Queue, message: str) -> None:
+        """
+        Add a message to a bounded queue, dropping its oldest message when full.
+        Keeps a slow client's backlog, and so server memory, bounded.
         
-        # Create a copy of clients to avoid modification during iteration
-        clients = self.clients.copy()
+        :param queue: A client's outbound queue
+        :param message: The message to add
+        """
+        if queue.full():
+            queue.get_nowait()
+            queue.task_done()
+        queue.put_nowait(message)
+    
+    def _register_client(self, websocket) -> asyncio.Queue:
+        """
+        Add a client and start the task that sends its queued messages.
+        Must run on the server's event loop.
         
-        # Broadcast to all clients
-        await asyncio.gather(
-            *[self._send_to_client(client, message) for client in clients],
-            return_exceptions=True
-        )
+        :param websocket: The WebSocket connection
+        :return: The client's outbound queue
+        """
+        if self._send_semaphore is None:
+            self._send_semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_SENDS)
+        queue = asyncio.Queue(maxsize=self.CLIENT_QUEUE_SIZE)
+        self.clients.add(websocket)
+        self._client_queues[websocket] = queue
+        self._sender_tasks[websocket] = asyncio.ensure_future(self._sender(websocket, queue))
+        return queue
     
-    async def _send_to_client(self, client, message: str) -> None:
+    def _unregister_client(self, websocket) -> None:
+        """
+        Remove a client and stop its sender task.
+        
+        :param websocket: The WebSocket connection
+        """
+        self.clients.discard(websocket)
+        self._client_queues.pop(websocket, None)
+        task = self._sender_tasks.pop(websocket, None)
+        if task is not None:
+            task.cancel()
+    
+    async def _sender(self, websocket, queue: asyncio.Queue) -> None:
+        """
+        Send a client's queued messages in order until a send fails,
+        then close the client's connection.
+        
+        :param websocket: The WebSocket connection
+        :param queue: The client's outbound queue
+        """
+        while True:
+            message = await queue.get()
+            try:
+                sent = await self._send_to_client(websocket, message)
+            finally:
+                queue.task_done()
+            if not sent:
+                # Stop broadcasting to a client that is gone or too slow and
+                # close it, so its handler cleans up and the browser can
+                # reconnect instead of staying connected without output
+                self.clients.discard(websocket)
+                self._client_queues.pop(websocket, None)
+                # Not _unregister_client(): cancelling this task would
+                # interrupt the close below
+                self._sender_tasks.pop(websocket, None)
+                try:
+                    await websocket.close()
+                except Exception:
+                    pass
+                return
+    
+    async def _send_to_client(self, client, message: str) -> bool:
         """
         Send a message to a single client.
         
         :param client: The WebSocket client
         :param message: The message to send
+        :return: True if the message was sent, False if the client is gone or too slow
         """
         try:
-            await client.send(message)
+            async with self._send_semaphore:
+                await asyncio.wait_for(client.send(message), timeout=self.SEND_TIMEOUT)
         except Exception:
-            # Client disconnected or error, will be handled in handler
-            pass
+            # Client disconnected, errored or timed out
+            return False
+        return True
     
     async def handler(self, websocket) -> None:
         """
@@ -141,7 +235,7 @@ class WebSocketTerminalServer:
         :param websocket: The WebSocket connection
         """
         # Register client
-        self.clients.add(websocket)
+        self._register_client(websocket)
         print(
             f"Client connected from {websocket.remote_address}. "
             f"Total clients: {len(self.clients)}"
@@ -149,11 +243,7 @@ class WebSocketTerminalServer:
         
         try:
             # Send welcome message
-            welcome = json.dumps({
-                "type": "info",
-                "data": "Connected to MQTT Terminal Streamer"
-            })
-            await websocket.send(welcome)
+            await websocket.send(WELCOME_MESSAGE)
             
             # Keep connection alive and handle incoming messages
             async for message in websocket:
@@ -161,14 +251,14 @@ class WebSocketTerminalServer:
                 try:
                     data = json.loads(message)
                     if data.get("type") == "ping":
-                        await websocket.send(json.dumps({"type": "pong"}))
+                        await websocket.send(PONG_MESSAGE)
                 except json.JSONDecodeError:
                     pass
         except websockets.exceptions.ConnectionClosed:
             pass
         finally:
             # Unregister client
-            self.clients.remove(websocket)
+            self._unregister_client(websocket)
             print(f"Client disconnected. Total clients: {len(self.clients)}")
     
     async def start_server(self) -> None:
@@ -341,8 +431,11 @@ def main():
         "--topic", args.mqtt_topic,
     ]
     
+    # Use the faster libuv event loop when it is available
+    run = uvloop.run if uvloop is not None else asyncio.run
+    
     try:
-        asyncio.run(main_async(args))
+        run(main_async(args))
     except KeyboardInterrupt:
         print("\n\nShutting down server...")
         print("Goodbye!")
@@ -2,10 +2,16 @@
 Base sensor plugin class
 """
 
+import sys
 import time
 from abc import ABC, abstractmethod
 from typing import Any, Dict
 
+# Placeholder for readings that are not available. Interned so that the
+# == "n/a" checks in format_display short-circuit on identity whenever the
+# value came from a plugin's own data dict.
+NOT_AVAILABLE = sys.intern("n/a")
+
 
 class SensorPlugin(ABC):
     """Base class for sensor plugins"""
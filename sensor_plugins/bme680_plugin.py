@@ -7,12 +7,20 @@ import time
 from pathlib import Path
 from typing import Any, Dict, Optional
 
-from sensor_plugins.base import SensorPlugin
+from sensor_plugins.base import NOT_AVAILABLE, SensorPlugin
 
 
 class BME680Plugin(SensorPlugin):
     """Plugin for BME680 environmental sensor"""
 
+    _UNAVAILABLE = {
+        "temperature": NOT_AVAILABLE,
+        "humidity": NOT_AVAILABLE,
+        "pressure": NOT_AVAILABLE,
+        "gas_resistance": NOT_AVAILABLE,
+        "air_quality": NOT_AVAILABLE,
+    }
+
     def __init__(
         self,
         check_interval: float = 5.0,
@@ -76,11 +84,11 @@ class BME680Plugin(SensorPlugin):
     def _read_sensor_data(self) -> Dict[str, Any]:
         """Read environmental data from BME680"""
         result = {
-            "temperature": "n/a",
-            "humidity": "n/a",
-            "pressure": "n/a",
-            "gas_resistance": "n/a",
-            "air_quality": "n/a",
+            "temperature": NOT_AVAILABLE,
+            "humidity": NOT_AVAILABLE,
+            "pressure": NOT_AVAILABLE,
+            "gas_resistance": NOT_AVAILABLE,
+            "air_quality": NOT_AVAILABLE,
         }
 
         # Collect burn-in data if needed
@@ -168,22 +176,16 @@ class BME680Plugin(SensorPlugin):
 
     def _get_unavailable_data(self) -> Dict[str, Any]:
         """Return n/a for all BME680 values"""
-        return {
-            "temperature": "n/a",
-            "humidity": "n/a",
-            "pressure": "n/a",
-            "gas_resistance": "n/a",
-            "air_quality": "n/a",
-        }
+        return self._UNAVAILABLE.copy()
 
     def format_display(self, data: Dict[str, Any]) -> str:
         """Format air quality or burn-in status for display"""
         burn_in_remaining = data.get("burn_in_remaining")
-        air_quality = data.get("air_quality", "n/a")
+        air_quality = data.get("air_quality", NOT_AVAILABLE)
 
         if burn_in_remaining is not None:
             return f"Burn-in: {burn_in_remaining}s"
-        elif air_quality != "n/a":
+        elif air_quality != NOT_AVAILABLE:
             return f"AirQ: {air_quality:.1f}"
         else:
             return "AirQ: n/a"
@@ -7,7 +7,7 @@ import threading
 from collections import deque
 from typing import Any, Dict
 
-from sensor_plugins.base import SensorPlugin
+from sensor_plugins.base import NOT_AVAILABLE, SensorPlugin
 
 
 class KeyboardPlugin(SensorPlugin):
@@ -133,12 +133,12 @@ class KeyboardPlugin(SensorPlugin):
 
     def _get_unavailable_data(self) -> Dict[str, Any]:
         """Return n/a for keyboard data"""
-        return {"last_keys": "n/a"}
+        return {"last_keys": NOT_AVAILABLE}
 
     def format_display(self, data: Dict[str, Any]) -> str:
         """Format keyboard data for display (right-aligned)"""
-        keys = data.get("last_keys", "n/a")
-        if keys == "n/a":
+        keys = data.get("last_keys", NOT_AVAILABLE)
+        if keys == NOT_AVAILABLE:
             return "Keys: n/a"
         elif not keys:
             return "Keys: _____"
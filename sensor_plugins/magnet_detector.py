@@ -20,9 +20,9 @@ initial state — works whether the magnet starts near or far from the
 sensor.
 """
 
-import math
+from bisect import bisect_left, insort
 from collections import deque
-from typing import Tuple
+from typing import Iterable, List, Tuple
 
 
 class MagnetDetector:
@@ -38,6 +38,18 @@ class MagnetDetector:
     in *either* direction from the established baseline.
     """
 
+    # One detector lives per magnetometer and update() reads most of these
+    # on every sample; slots keep that access off the instance dict
+    __slots__ = (
+        "baseline_samples",
+        "detection_sigma",
+        "release_sigma",
+        "min_baseline_samples",
+        "clean_history",
+        "_sorted_history",
+        "magnet_detected",
+    )
+
     # MAD-to-sigma conversion factor for the normal distribution
     MAD_SCALE_FACTOR = 1.4826
     # Floor for sigma to avoid division-by-zero when readings are near-constant
@@ -64,6 +76,9 @@ class MagnetDetector:
         self.min_baseline_samples = min_baseline_samples
 
         self.clean_history: deque = deque(maxlen=baseline_samples)
+        # Sorted mirror of clean_history so the baseline median is an index
+        # lookup instead of a full sort on every update
+        self._sorted_history: List[float] = []
         self.magnet_detected: bool = False
 
     # ------------------------------------------------------------------
@@ -73,7 +88,11 @@ class MagnetDetector:
     @staticmethod
     def _median(data) -> float:
         """Return the median of *data* (non-empty iterable of numbers)."""
-        sorted_data = sorted(data)
+        return MagnetDetector._sorted_median(sorted(data))
+
+    @staticmethod
+    def _sorted_median(sorted_data) -> float:
+        """Return the median of *sorted_data* (non-empty, ascending sequence)."""
         n = len(sorted_data)
         mid = n // 2
         if n % 2 == 0:
@@ -91,6 +110,53 @@ class MagnetDetector:
         deviations = [abs(x - median) for x in data]
         return self._median(deviations)
 
+    @staticmethod
+    def _sorted_mad(sorted_data, median: float) -> float:
+        """
+        MAD of *sorted_data* in a single linear pass.
+
+        Deviations grow outward from *median* on both sides of a sorted
+        window, so merging the two sides yields them in ascending order
+        and the middle one can be picked without building and sorting a
+        deviation list.
+
+        :param sorted_data: Non-empty, ascending sequence of samples
+        :param median: Pre-computed median of *sorted_data*
+        :return: MAD value
+        """
+        n = len(sorted_data)
+        right = bisect_left(sorted_data, median)
+        left = right - 1
+        previous = deviation = 0.0
+        for _ in range(n // 2 + 1):
+            previous = deviation
+            if right < n and (
+                left < 0 or sorted_data[right] - median <= median - sorted_data[left]
+            ):
+                deviation = sorted_data[right] - median
+                right += 1
+            else:
+                deviation = median - sorted_data[left]
+                left -= 1
+        if n % 2 == 0:
+            return (previous + deviation) / 2.0
+        return float(deviation)
+
+    def _add_clean_sample(self, magnitude: float) -> None:
+        """
+        Append a clean reading to the baseline window.
+
+        Keeps ``_sorted_history`` in step with ``clean_history``, evicting
+        the oldest sample from both once the window is full.
+
+        :param magnitude: Reading accepted as part of the baseline
+        """
+        if len(self.clean_history) == self.clean_history.maxlen:
+            evicted = self.clean_history[0]
+            del self._sorted_history[bisect_left(self._sorted_history, evicted)]
+        self.clean_history.append(magnitude)
+        insort(self._sorted_history, magnitude)
+
     # ------------------------------------------------------------------
     # Core API
     # ------------------------------------------------------------------
@@ -109,15 +175,15 @@ class MagnetDetector:
         # Calibration phase: always accept samples
         # ----------------------------------------------------------
         if len(self.clean_history) < self.min_baseline_samples:
-            self.clean_history.append(magnitude)
-            baseline = self._median(self.clean_history)
+            self._add_clean_sample(magnitude)
+            baseline = self._sorted_median(self._sorted_history)
             return False, baseline, 0.0
 
         # ----------------------------------------------------------
         # Compute robust statistics on the clean baseline
         # ----------------------------------------------------------
-        baseline = self._median(self.clean_history)
-        mad = self._calculate_mad(self.clean_history, baseline)
+        baseline = self._sorted_median(self._sorted_history)
+        mad = self._sorted_mad(self._sorted_history, baseline)
         sigma = max(mad * self.MAD_SCALE_FACTOR, self.MIN_SIGMA)
 
         # Bi-directional robust z-score
@@ -130,18 +196,32 @@ class MagnetDetector:
             if z_score < self.release_sigma:
                 # Field returned to normal — release detection
                 self.magnet_detected = False
-                self.clean_history.append(magnitude)
+                self._add_clean_sample(magnitude)
         else:
             if z_score > self.detection_sigma:
                 # Significant deviation — trigger detection
                 self.magnet_detected = True
             else:
                 # Normal reading — update baseline
-                self.clean_history.append(magnitude)
+                self._add_clean_sample(magnitude)
 
         return self.magnet_detected, baseline, z_score
 
+    def update_bulk(self, magnitudes: Iterable[float]) -> List[Tuple[bool, float, float]]:
+        """
+        Process a burst of readings in order.
+
+        Equivalent to calling :meth:`update` once per reading, with the
+        method lookup hoisted out of the loop.
+
+        :param magnitudes: Magnetic field magnitudes (Gauss), oldest first
+        :return: One ``(magnet_detected, baseline, z_score)`` tuple per reading
+        """
+        update = self.update
+        return [update(magnitude) for magnitude in magnitudes]
+
     def reset(self) -> None:
         """Clear all state and begin a fresh calibration phase."""
         self.clean_history.clear()
+        self._sorted_history.clear()
         self.magnet_detected = False
@@ -8,15 +8,26 @@ for full algorithm details.
 """
 
 import math
-from typing import Any, Dict
+from typing import Any, Dict, List
 
-from sensor_plugins.base import SensorPlugin
+from sensor_plugins.base import NOT_AVAILABLE, SensorPlugin
 from sensor_plugins.magnet_detector import MagnetDetector
 
 
 class MMC5983Plugin(SensorPlugin):
     """Plugin for MMC5983 magnetometer with magnet proximity detection"""
 
+    _UNAVAILABLE = {
+        "mag_x": NOT_AVAILABLE,
+        "mag_y": NOT_AVAILABLE,
+        "mag_z": NOT_AVAILABLE,
+        "magnitude": NOT_AVAILABLE,
+        "temperature": NOT_AVAILABLE,
+        "magnet_detected": NOT_AVAILABLE,
+        "baseline": NOT_AVAILABLE,
+        "detection_z_score": NOT_AVAILABLE,
+    }
+
     def __init__(
         self,
         check_interval: float = 5.0,
@@ -71,7 +82,7 @@ class MMC5983Plugin(SensorPlugin):
         :param z: Z-axis magnetic field (Gauss)
         :return: Magnitude of the magnetic field vector (Gauss)
         """
-        return math.sqrt(x**2 + y**2 + z**2)
+        return math.hypot(x, y, z)
 
     def _read_sensor_data(self) -> Dict[str, Any]:
         """Read magnetic field data from MMC5983"""
@@ -92,25 +103,43 @@ class MMC5983Plugin(SensorPlugin):
             "detection_z_score": z_score,
         }
 
+    def read_many(self, count: int) -> List[Dict[str, Any]]:
+        """
+        Take several consecutive readings, checking availability only once
+
+        Useful for seeding the detector baseline. Every reading gets its own
+        dict because callers may keep them. If a read fails, the sensor is
+        marked unavailable and the remaining entries are n/a, as with read().
+
+        :param count: Number of readings to take
+        :return: List of ``count`` data dictionaries
+        """
+        if not self.check_availability():
+            return [self._get_unavailable_data() for _ in range(count)]
+
+        read = self._read_sensor_data
+        results = []
+        try:
+            for _ in range(count):
+                results.append(read())
+        except Exception:
+            self.available = False
+            self.sensor_instance = None
+            results.extend(
+                self._get_unavailable_data() for _ in range(count - len(results))
+            )
+        return results
+
     def _get_unavailable_data(self) -> Dict[str, Any]:
         """Return n/a for all magnetic sensor values"""
-        return {
-            "mag_x": "n/a",
-            "mag_y": "n/a",
-            "mag_z": "n/a",
-            "magnitude": "n/a",
-            "temperature": "n/a",
-            "magnet_detected": "n/a",
-            "baseline": "n/a",
-            "detection_z_score": "n/a",
-        }
+        return self._UNAVAILABLE.copy()
 
     def format_display(self, data: Dict[str, Any]) -> str:
         """Format magnetic sensor data for display"""
-        magnitude = data.get("magnitude", "n/a")
-        magnet_detected = data.get("magnet_detected", "n/a")
+        magnitude = data.get("magnitude", NOT_AVAILABLE)
+        magnet_detected = data.get("magnet_detected", NOT_AVAILABLE)
 
-        if magnitude == "n/a":
+        if magnitude == NOT_AVAILABLE:
             return "MAG:n/a"
 
         if magnet_detected:
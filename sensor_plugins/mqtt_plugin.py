@@ -5,15 +5,43 @@ MQTT virtual sensor plugin
 import json
 import math
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict
 
-from sensor_plugins.base import SensorPlugin
+from sensor_plugins.base import NOT_AVAILABLE, SensorPlugin
 from sensor_plugins.magnet_detector import MagnetDetector
 
 
 class MQTTPlugin(SensorPlugin):
     """Plugin for MQTT virtual sensor that subscribes to sensor data"""
 
+    # Shared n/a template; always copied because _read_sensor_data fills in
+    # (and may add) keys on the dict it starts from
+    _UNAVAILABLE = {
+        "temperature": NOT_AVAILABLE,
+        "humidity": NOT_AVAILABLE,
+        "pressure": NOT_AVAILABLE,
+        "gas_resistance": NOT_AVAILABLE,
+        "air_quality": NOT_AVAILABLE,
+        "light": NOT_AVAILABLE,
+        "temp_c": NOT_AVAILABLE,
+        "voltage": NOT_AVAILABLE,
+        "soc": NOT_AVAILABLE,
+        "ssid": NOT_AVAILABLE,
+        "rssi": NOT_AVAILABLE,
+        "presence_value": NOT_AVAILABLE,
+        "motion_value": NOT_AVAILABLE,
+        "sths34_temperature": NOT_AVAILABLE,
+        "person_detected": NOT_AVAILABLE,
+        "mag_x": NOT_AVAILABLE,
+        "mag_y": NOT_AVAILABLE,
+        "mag_z": NOT_AVAILABLE,
+        "mag_magnitude": NOT_AVAILABLE,
+        "mag_temperature": NOT_AVAILABLE,
+        "magnet_detected": NOT_AVAILABLE,
+        "mag_baseline": NOT_AVAILABLE,
+        "mag_z_score": NOT_AVAILABLE,
+    }
+
     def __init__(
         self,
         broker_host: str = "localhost",
@@ -25,6 +53,8 @@ class MQTTPlugin(SensorPlugin):
         mag_detection_sigma: float = 5.0,
         mag_release_sigma: float = 3.0,
         mag_min_baseline_samples: int = 10,
+        connect_timeout: float = 5.0,
+        clock: Callable[[], float] = time.time,
     ):
         """
         Initialize MQTT sensor plugin
@@ -38,11 +68,15 @@ class MQTTPlugin(SensorPlugin):
         :param mag_detection_sigma: MAD-sigma threshold for magnet detection
         :param mag_release_sigma: MAD-sigma threshold for releasing detection
         :param mag_min_baseline_samples: Minimum samples before detection starts
+        :param connect_timeout: Seconds to wait for the broker to acknowledge the connection
+        :param clock: Time source in seconds, used for the connect timeout and burn-in
         """
         super().__init__("MQTT", check_interval)
         self.broker_host = broker_host
         self.broker_port = broker_port
         self.topic = topic
+        self.connect_timeout = connect_timeout
+        self._clock = clock
         self.latest_message = None
         self.message_received = False
         
@@ -111,9 +145,8 @@ class MQTTPlugin(SensorPlugin):
         client.loop_start()
         
         # Wait for connection to be established (with timeout)
-        timeout = 5.0  # 5 second timeout
-        start = time.time()
-        while not connection_successful[0] and (time.time() - start) < timeout:
+        start = self._clock()
+        while not connection_successful[0] and (self._clock() - start) < self.connect_timeout:
             time.sleep(0.1)
         
         if not connection_successful[0]:
@@ -125,7 +158,7 @@ class MQTTPlugin(SensorPlugin):
             )
         
         # Initialize BME68x burn-in tracking
-        self.start_time = time.time()
+        self.start_time = self._clock()
         self.burn_in_complete = False
         self.burn_in_data = []
         
@@ -133,31 +166,7 @@ class MQTTPlugin(SensorPlugin):
 
     def _read_sensor_data(self) -> Dict[str, Any]:  # noqa: PLR0914 - Complex sensor data extraction method
         """Read data from latest MQTT message"""
-        result = {
-            "temperature": "n/a",
-            "humidity": "n/a",
-            "pressure": "n/a",
-            "gas_resistance": "n/a",
-            "air_quality": "n/a",
-            "light": "n/a",
-            "temp_c": "n/a",
-            "voltage": "n/a",
-            "soc": "n/a",
-            "ssid": "n/a",
-            "rssi": "n/a",
-            "presence_value": "n/a",
-            "motion_value": "n/a",
-            "sths34_temperature": "n/a",
-            "person_detected": "n/a",
-            "mag_x": "n/a",
-            "mag_y": "n/a",
-            "mag_z": "n/a",
-            "mag_magnitude": "n/a",
-            "mag_temperature": "n/a",
-            "magnet_detected": "n/a",
-            "mag_baseline": "n/a",
-            "mag_z_score": "n/a",
-        }
+        result = self._UNAVAILABLE.copy()
 
         if not self.message_received or self.latest_message is None:
             return result
@@ -177,8 +186,8 @@ class MQTTPlugin(SensorPlugin):
                 result["gas_resistance"] = bme_data["Gas Resistance"]
             
             # Handle burn-in period for air quality calculation
-            curr_time = time.time()
-            if not self.burn_in_complete and result["gas_resistance"] != "n/a":
+            curr_time = self._clock()
+            if not self.burn_in_complete and result["gas_resistance"] != NOT_AVAILABLE:
                 if curr_time - self.start_time < self.burn_in_time:
                     gas = result["gas_resistance"]
                     self.burn_in_data.append(gas)
@@ -203,8 +212,8 @@ class MQTTPlugin(SensorPlugin):
             if (
                 self.burn_in_complete
                 and self.gas_baseline
-                and result["gas_resistance"] != "n/a"
-                and result["humidity"] != "n/a"
+                and result["gas_resistance"] != NOT_AVAILABLE
+                and result["humidity"] != NOT_AVAILABLE
             ):
                 gas = result["gas_resistance"]
                 gas_offset = self.gas_baseline - gas
@@ -280,13 +289,16 @@ class MQTTPlugin(SensorPlugin):
             # Person is detected if presence value >= 1000 OR motion value > 0
             # Using same threshold as STHS34PF80Plugin default
             presence_threshold = 1000
-            if result["presence_value"] != "n/a" and result["motion_value"] != "n/a":
+            if (
+                result["presence_value"] != NOT_AVAILABLE
+                and result["motion_value"] != NOT_AVAILABLE
+            ):
                 presence_detected = result["presence_value"] >= presence_threshold
                 motion_detected = result["motion_value"] > 0
                 result["person_detected"] = presence_detected or motion_detected
-            elif result["presence_value"] != "n/a":
+            elif result["presence_value"] != NOT_AVAILABLE:
                 result["person_detected"] = result["presence_value"] >= presence_threshold
-            elif result["motion_value"] != "n/a":
+            elif result["motion_value"] != NOT_AVAILABLE:
                 result["person_detected"] = result["motion_value"] > 0
 
         # Extract MMC5983 magnetometer data
@@ -303,15 +315,13 @@ class MQTTPlugin(SensorPlugin):
             
             # Calculate magnitude and detect magnet if we have all 3 axes
             if (
-                result["mag_x"] != "n/a"
-                and result["mag_y"] != "n/a"
-                and result["mag_z"] != "n/a"
+                result["mag_x"] != NOT_AVAILABLE
+                and result["mag_y"] != NOT_AVAILABLE
+                and result["mag_z"] != NOT_AVAILABLE
             ):
                 # Calculate 3D magnitude
-                magnitude = math.sqrt(
-                    result["mag_x"] ** 2
-                    + result["mag_y"] ** 2
-                    + result["mag_z"] ** 2
+                magnitude = math.hypot(
+                    result["mag_x"], result["mag_y"], result["mag_z"]
                 )
                 result["mag_magnitude"] = magnitude
                 
@@ -325,40 +335,16 @@ class MQTTPlugin(SensorPlugin):
 
     def _get_unavailable_data(self) -> Dict[str, Any]:
         """Return n/a for all sensor values"""
-        return {
-            "temperature": "n/a",
-            "humidity": "n/a",
-            "pressure": "n/a",
-            "gas_resistance": "n/a",
-            "air_quality": "n/a",
-            "light": "n/a",
-            "temp_c": "n/a",
-            "voltage": "n/a",
-            "soc": "n/a",
-            "ssid": "n/a",
-            "rssi": "n/a",
-            "presence_value": "n/a",
-            "motion_value": "n/a",
-            "sths34_temperature": "n/a",
-            "person_detected": "n/a",
-            "mag_x": "n/a",
-            "mag_y": "n/a",
-            "mag_z": "n/a",
-            "mag_magnitude": "n/a",
-            "mag_temperature": "n/a",
-            "magnet_detected": "n/a",
-            "mag_baseline": "n/a",
-            "mag_z_score": "n/a",
-        }
+        return self._UNAVAILABLE.copy()
 
     def format_display(self, data: Dict[str, Any]) -> str:
         """Format sensor data for display"""
         burn_in_remaining = data.get("burn_in_remaining")
-        air_quality = data.get("air_quality", "n/a")
+        air_quality = data.get("air_quality", NOT_AVAILABLE)
 
         if burn_in_remaining is not None:
             return f"MQTT Burn-in: {burn_in_remaining}s"
-        elif air_quality != "n/a":
+        elif air_quality != NOT_AVAILABLE:
             return f"MQTT AirQ: {air_quality:.1f}"
         else:
             return "MQTT: n/a"
@@ -4,12 +4,19 @@ STHS34PF80 IR presence/motion sensor plugin
 
 from typing import Any, Dict
 
-from sensor_plugins.base import SensorPlugin
+from sensor_plugins.base import NOT_AVAILABLE, SensorPlugin
 
 
 class STHS34PF80Plugin(SensorPlugin):
     """Plugin for STHS34PF80 IR presence/motion sensor"""
 
+    _UNAVAILABLE = {
+        "presence_value": NOT_AVAILABLE,
+        "motion_value": NOT_AVAILABLE,
+        "temperature": NOT_AVAILABLE,
+        "person_present": NOT_AVAILABLE,
+    }
+
     def __init__(self, check_interval: float = 5.0, presence_threshold: int = 1000):
         """
         Initialize STHS34PF80 sensor plugin
@@ -49,19 +56,14 @@ class STHS34PF80Plugin(SensorPlugin):
 
     def _get_unavailable_data(self) -> Dict[str, Any]:
         """Return n/a for all sensor values"""
-        return {
-            "presence_value": "n/a",
-            "motion_value": "n/a",
-            "temperature": "n/a",
-            "person_present": "n/a",
-        }
+        return self._UNAVAILABLE.copy()
 
     def format_display(self, data: Dict[str, Any]) -> str:
         """Format sensor data for display"""
-        person_present = data.get("person_present", "n/a")
-        presence_value = data.get("presence_value", "n/a")
+        person_present = data.get("person_present", NOT_AVAILABLE)
+        presence_value = data.get("presence_value", NOT_AVAILABLE)
         
-        if person_present == "n/a":
+        if person_present == NOT_AVAILABLE:
             return "STHS34:n/a"
         elif person_present:
             return f"STHS34:PRESENT({presence_value})"
@@ -5,7 +5,7 @@ System information sensor plugins
 import socket
 from typing import Any, Dict
 
-from sensor_plugins.base import SensorPlugin
+from sensor_plugins.base import NOT_AVAILABLE, SensorPlugin
 
 # Try to use psutil for better performance, fallback to defaults if not available
 try:
@@ -47,7 +47,7 @@ class IPAddressPlugin(SensorPlugin):
 
     def _get_unavailable_data(self) -> Dict[str, Any]:
         """Return default IP when unavailable"""
-        return {"ip_address": "n/a"}
+        return {"ip_address": NOT_AVAILABLE}
 
 
 class CPULoadPlugin(SensorPlugin):
@@ -71,11 +71,11 @@ class CPULoadPlugin(SensorPlugin):
                 return {"cpu_load": "0.50"}
         else:
             # psutil not available - return default
-            return {"cpu_load": "n/a"}
+            return {"cpu_load": NOT_AVAILABLE}
 
     def _get_unavailable_data(self) -> Dict[str, Any]:
         """Return n/a for CPU load"""
-        return {"cpu_load": "n/a"}
+        return {"cpu_load": NOT_AVAILABLE}
 
 
 class MemoryUsagePlugin(SensorPlugin):
@@ -101,8 +101,8 @@ class MemoryUsagePlugin(SensorPlugin):
                 return {"memory_usage": "512/2048 MB"}
         else:
             # psutil not available - return default
-            return {"memory_usage": "n/a"}
+            return {"memory_usage": NOT_AVAILABLE}
 
     def _get_unavailable_data(self) -> Dict[str, Any]:
         """Return n/a for memory usage"""
-        return {"memory_usage": "n/a"}
+        return {"memory_usage": NOT_AVAILABLE}
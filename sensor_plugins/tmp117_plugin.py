@@ -4,7 +4,7 @@ TMP117 temperature sensor plugin
 
 from typing import Any, Dict
 
-from sensor_plugins.base import SensorPlugin
+from sensor_plugins.base import NOT_AVAILABLE, SensorPlugin
 
 
 class TMP117Plugin(SensorPlugin):
@@ -29,11 +29,11 @@ class TMP117Plugin(SensorPlugin):
 
     def _get_unavailable_data(self) -> Dict[str, Any]:
         """Return n/a for temperature"""
-        return {"temp_c": "n/a"}
+        return {"temp_c": NOT_AVAILABLE}
 
     def format_display(self, data: Dict[str, Any]) -> str:
         """Format temperature data for display"""
-        temp_c = data.get("temp_c", "n/a")
-        if temp_c == "n/a":
+        temp_c = data.get("temp_c", NOT_AVAILABLE)
+        if temp_c == NOT_AVAILABLE:
             return "T:n/a"
         return f"T:{temp_c:.2f}"
@@ -4,7 +4,7 @@ VEML7700 light sensor plugin
 
 from typing import Any, Dict
 
-from sensor_plugins.base import SensorPlugin
+from sensor_plugins.base import NOT_AVAILABLE, SensorPlugin
 
 
 class VEML7700Plugin(SensorPlugin):
@@ -28,11 +28,11 @@ class VEML7700Plugin(SensorPlugin):
 
     def _get_unavailable_data(self) -> Dict[str, Any]:
         """Return n/a for light level"""
-        return {"light": "n/a"}
+        return {"light": NOT_AVAILABLE}
 
     def format_display(self, data: Dict[str, Any]) -> str:
         """Format light data for display"""
-        light = data.get("light", "n/a")
-        if light == "n/a":
+        light = data.get("light", NOT_AVAILABLE)
+        if light == NOT_AVAILABLE:
             return "light:n/a"
         return f"light:{light:.0f}"
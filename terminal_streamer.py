@@ -14,7 +14,52 @@ between the data source and consumers.
 import io
 import sys
 import threading
-from typing import Callable, List, Optional
+import time
+from typing import Callable, Optional, Tuple
+
+
+class _StreamerStream(io.TextIOBase):
+    """
+    Text stream installed as sys.stdout/sys.stderr while capturing.
+
+    Routes writes through the streamer's tee-and-buffer path and reports
+    the replaced stream's encoding and tty status, so code that inspects
+    sys.stdout sees a real text stream rather than a bare object with a
+    write method.
+    """
+
+    def __init__(self, streamer: "TerminalStreamer", original):
+        """
+        Initialize the capture stream.
+
+        :param streamer: The TerminalStreamer receiving the output
+        :param original: The stream being replaced
+        """
+        super().__init__()
+        self._streamer = streamer
+        self._original = original
+
+    @property
+    def encoding(self) -> str:
+        """Encoding of the replaced stream"""
+        return getattr(self._original, "encoding", None) or "utf-8"
+
+    def writable(self) -> bool:
+        """Captured streams are write-only"""
+        return True
+
+    def isatty(self) -> bool:
+        """Whether the replaced stream is a terminal"""
+        return getattr(self._original, "isatty", lambda: False)()
+
+    def write(self, text: str) -> int:
+        """Tee *text* to the terminal and queue it for broadcast"""
+        self._streamer.write(text)
+        return len(text)
+
+    def flush(self) -> None:
+        """Broadcast pending output and flush the terminal"""
+        self._streamer.flush()
 
 
 class TerminalStreamer:
@@ -24,12 +69,59 @@ class TerminalStreamer:
     This class can wrap stdout/stderr or capture output from functions,
     allowing scripts to work normally while also streaming their output.
     """
+
+    # Output passed to write() is coalesced and broadcast once it contains a
+    # newline or carriage return or reaches the flush size (FLUSH_SIZE
+    # characters by default). A partial line, such as a prompt, is sent on
+    # flush() or after sitting in the buffer for the flush delay (FLUSH_DELAY
+    # seconds by default); a single flusher thread handles that and exits
+    # after FLUSHER_IDLE_TIMEOUT seconds without pending output
+    FLUSH_SIZE = 8192
+    FLUSH_DELAY = 0.05
+    FLUSHER_IDLE_TIMEOUT = 1.0
+    
+    __slots__ = (
+        "_flush_size",
+        "_flush_delay",
+        "_callbacks",
+        "_lock",
+        "_buffer",
+        "_buffer_size",
+        "_buffer_lock",
+        "_pending",
+        "_flush_lock",
+        "_flushes",
+        "_flusher",
+        "_original_stdout",
+        "_original_stderr",
+        "_capturing",
+    )
     
-    def __init__(self):
-        """Initialize the terminal streamer"""
-        self._callbacks: List[Callable[[str], None]] = []
+    def __init__(self, flush_size: int = FLUSH_SIZE, flush_delay: float = FLUSH_DELAY):
+        """
+        Initialize the terminal streamer.
+        
+        :param flush_size: Buffered characters that trigger a broadcast without a newline
+        :param flush_delay: Seconds a partial line is held before it is broadcast
+        """
+        self._flush_size = flush_size
+        self._flush_delay = flush_delay
+        # Immutable and replaced (under _lock) on every registration change,
+        # so broadcast() can iterate it without locking
+        self._callbacks: Tuple[Callable[[str], None], ...] = ()
         self._lock = threading.Lock()
         self._buffer = io.StringIO()
+        self._buffer_size = 0
+        # Guards the buffer only; writers never wait on callbacks
+        self._buffer_lock = threading.Lock()
+        # Signalled when output starts pending in an empty buffer
+        self._pending = threading.Condition(self._buffer_lock)
+        # Held from taking a chunk until it is broadcast, so chunks reach
+        # callbacks in order; reentrant so a callback that prints can write()
+        self._flush_lock = threading.RLock()
+        # Number of chunks taken from the buffer, see _flush_idle
+        self._flushes = 0
+        self._flusher: Optional[threading.Thread] = None
         self._original_stdout = None
         self._original_stderr = None
         self._capturing = False
@@ -40,9 +132,12 @@ class TerminalStreamer:
         
         :param callback: Function that takes a string and handles the output
         """
+        # Checking the current tuple needs no lock; only a change takes it
+        if callback in self._callbacks:
+            return
         with self._lock:
             if callback not in self._callbacks:
-                self._callbacks.append(callback)
+                self._callbacks = self._callbacks + (callback,)
     
     def unregister_callback(self, callback: Callable[[str], None]) -> None:
         """
@@ -50,9 +145,19 @@ class TerminalStreamer:
         
         :param callback: The callback to remove
         """
+        if callback not in self._callbacks:
+            return
         with self._lock:
             if callback in self._callbacks:
-                self._callbacks.remove(callback)
+                self._callbacks = tuple(cb for cb in self._callbacks if cb != callback)
+    
+    @property
+    def has_subscribers(self) -> bool:
+        """
+        Whether any callback is registered.
+        Lets callers skip building output that nobody would receive.
+        """
+        return bool(self._callbacks)
     
     def broadcast(self, text: str) -> None:
         """
@@ -60,13 +165,30 @@ class TerminalStreamer:
         
         :param text: The text to broadcast
         """
-        with self._lock:
-            for callback in self._callbacks:
-                try:
+        if not self._callbacks:
+            return
+
+        # One try block around the whole loop keeps the common no-error case
+        # cheap; after a failure the shared iterator resumes with the next callback
+        callbacks = iter(self._callbacks)
+        errors = None
+        while True:
+            try:
+                for callback in callbacks:
                     callback(text)
-                except Exception as e:
-                    # Don't let one bad callback break others
-                    print(f"Error in callback: {e}", file=sys.stderr)
+                break
+            except Exception as e:
+                # Don't let one bad callback break others
+                if errors is None:
+                    errors = []
+                errors.append(e)
+
+        if errors:
+            # Report to the real stderr: while capturing, sys.stderr feeds
+            # this streamer and printing there would broadcast the errors again
+            stderr = self._original_stderr or sys.stderr
+            for e in errors:
+                print(f"Error in callback: {e}", file=stderr)
     
     def write(self, text: str) -> None:
         """
@@ -84,11 +206,70 @@ class TerminalStreamer:
             sys.stdout.write(text)
             sys.stdout.flush()
         
-        # Broadcast to callbacks
-        self.broadcast(text)
+        if not self._callbacks:
+            # Nobody is listening; don't buffer output only to drop it
+            return
+        
+        # Coalesce into the pending chunk rather than broadcasting every write
+        with self._buffer_lock:
+            was_empty = not self._buffer_size
+            self._buffer.write(text)
+            self._buffer_size += len(text)
+            flush_now = (
+                "\n" in text or "\r" in text or self._buffer_size >= self._flush_size
+            )
+            if not flush_now and was_empty:
+                if self._flusher is None:
+                    self._flusher = threading.Thread(
+                        target=self._flush_idle, name="TerminalStreamer-flush", daemon=True
+                    )
+                    self._flusher.start()
+                else:
+                    self._pending.notify()
+
+        if flush_now:
+            self._flush_buffer()
+
+    def _flush_buffer(self, expected_flushes: Optional[int] = None) -> None:
+        """
+        Broadcast pending output written via write() as a single chunk.
+        
+        :param expected_flushes: Only flush if no chunk was taken since _flushes had this value
+        """
+        with self._flush_lock:
+            with self._buffer_lock:
+                if not self._buffer_size:
+                    return
+                if expected_flushes is not None and expected_flushes != self._flushes:
+                    return
+                text = self._buffer.getvalue()
+                self._buffer = io.StringIO()
+                self._buffer_size = 0
+                self._flushes += 1
+
+            # Outside the buffer lock: a slow callback only holds up other
+            # flushes, and a callback that prints comes back to write()
+            self.broadcast(text)
+
+    def _flush_idle(self) -> None:
+        """Flusher thread: broadcast partial lines left pending for the flush delay"""
+        while True:
+            with self._buffer_lock:
+                if not self._pending.wait_for(
+                    lambda: self._buffer_size, self.FLUSHER_IDLE_TIMEOUT
+                ):
+                    # write() starts a new flusher once output is pending again
+                    self._flusher = None
+                    return
+                flushes = self._flushes
+            time.sleep(self._flush_delay)
+            # Skip if the line was completed meanwhile; newer output gets its
+            # own full delay on the next pass
+            self._flush_buffer(flushes)
     
     def flush(self) -> None:
         """Flush the output (required for file-like interface)"""
+        self._flush_buffer()
         if self._original_stdout is not None:
             self._original_stdout.flush()
         else:
@@ -104,14 +285,18 @@ class TerminalStreamer:
         
         self._original_stdout = sys.stdout
         self._original_stderr = sys.stderr
-        sys.stdout = self
-        sys.stderr = self
+        sys.stdout = _StreamerStream(self, self._original_stdout)
+        sys.stderr = _StreamerStream(self, self._original_stderr)
         self._capturing = True
     
     def stop_capture(self) -> None:
         """Stop capturing stdout and stderr"""
         if not self._capturing:
             return
+
+        self._flush_buffer()
+        self._original_stdout.flush()
+        self._original_stderr.flush()
         
         sys.stdout = self._original_stdout
         sys.stderr = self._original_stderr
@@ -126,6 +311,8 @@ class TerminalOutputCapture:
     This is useful when you want to capture output from a specific code block.
     """
     
+    __slots__ = ("streamer", "original_stdout", "original_stderr")
+    
     def __init__(self, streamer: TerminalStreamer):
         """
         Initialize the capture context.
@@ -0,0 +1,14 @@
+# SPDX-FileCopyrightText: 2026 Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""
+pytest configuration for the test suite
+"""
+
+
+def pytest_configure(config):
+    """Register markers used by the tests so runs without pytest-xdist stay warning-free"""
+    config.addinivalue_line(
+        "markers", "xdist_group(name): run the marked tests on the same xdist worker"
+    )
@@ -4,17 +4,20 @@
 
 """
 Tests for terminal streaming and WebSocket functionality
+
+Callbacks that only need their calls checked are the bound ``append`` of a
+plain list (``calls.append``), asserted with ``assertEqual(calls, [...])``;
+MagicMock is kept for callbacks that need a side_effect or call introspection.
 """
 
 import asyncio
 import json
 import sys
 import threading
-import time
 import unittest
-from io import StringIO
+from io import StringIO, TextIOBase
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -27,7 +30,9 @@ class TestTerminalStreamer(unittest.TestCase):
 
     def setUp(self):
         """Set up test fixtures"""
-        self.streamer = TerminalStreamer()
+        # A long flush delay keeps the idle flusher out of tests that check
+        # what is still buffered
+        self.streamer = TerminalStreamer(flush_delay=60)
 
     def tearDown(self):
         """Clean up after tests"""
@@ -61,52 +66,171 @@ class TestTerminalStreamer(unittest.TestCase):
 
     def test_broadcast(self):
         """Test broadcasting to callbacks"""
-        callback1 = MagicMock()
-        callback2 = MagicMock()
+        calls1 = []
+        calls2 = []
 
-        self.streamer.register_callback(callback1)
-        self.streamer.register_callback(callback2)
+        self.streamer.register_callback(calls1.append)
+        self.streamer.register_callback(calls2.append)
 
         # Broadcast some text
         self.streamer.broadcast("Hello, World!")
 
         # Both callbacks should have been called
-        callback1.assert_called_once_with("Hello, World!")
-        callback2.assert_called_once_with("Hello, World!")
+        self.assertEqual(calls1, ["Hello, World!"])
+        self.assertEqual(calls2, ["Hello, World!"])
+
+    def test_has_subscribers(self):
+        """Test has_subscribers follows callback registration"""
+        callback = MagicMock()
+        self.assertFalse(self.streamer.has_subscribers)
+
+        self.streamer.register_callback(callback)
+        self.assertTrue(self.streamer.has_subscribers)
+
+        self.streamer.unregister_callback(callback)
+        self.assertFalse(self.streamer.has_subscribers)
+
+    def test_write_without_subscribers_skips_buffer(self):
+        """Test output is only teed to stdout when nobody is subscribed"""
+        fake_stdout = StringIO()
+        with patch("sys.stdout", fake_stdout):
+            self.streamer.write("partial")
+
+        self.assertEqual(fake_stdout.getvalue(), "partial")
+        self.assertEqual(self.streamer._buffer_size, 0)
 
     def test_broadcast_with_failing_callback(self):
         """Test that one failing callback doesn't break others"""
         callback1 = MagicMock(side_effect=Exception("Test error"))
-        callback2 = MagicMock()
+        calls = []
 
         self.streamer.register_callback(callback1)
-        self.streamer.register_callback(callback2)
+        self.streamer.register_callback(calls.append)
 
         # Broadcast should not raise exception
         self.streamer.broadcast("Test")
 
         # Second callback should still be called
-        callback2.assert_called_once_with("Test")
+        self.assertEqual(calls, ["Test"])
+
+    def test_broadcast_continues_after_each_failure(self):
+        """Test every callback runs and every error is reported once"""
+        callbacks = [
+            MagicMock(side_effect=Exception("first")),
+            MagicMock(),
+            MagicMock(side_effect=Exception("second")),
+            MagicMock(),
+        ]
+        for callback in callbacks:
+            self.streamer.register_callback(callback)
+
+        fake_stderr = StringIO()
+        with patch("sys.stderr", fake_stderr):
+            self.streamer.broadcast("Test")
+
+        for callback in callbacks:
+            callback.assert_called_once_with("Test")
+        self.assertEqual(
+            fake_stderr.getvalue(),
+            "Error in callback: first\nError in callback: second\n",
+        )
+
+    def test_failing_callback_while_capturing(self):
+        """Test callback errors go to the real stderr instead of back through the streamer"""
+        failing = MagicMock(side_effect=Exception("Test error"))
+        self.streamer.register_callback(failing)
+
+        fake_stderr = StringIO()
+        with patch("sys.stdout", StringIO()), patch("sys.stderr", fake_stderr):
+            self.streamer.start_capture()
+            print("Captured", end="")
+            self.streamer.stop_capture()
+
+        failing.assert_any_call("Captured")
+        self.assertIn("Error in callback: Test error", fake_stderr.getvalue())
 
     def test_write_method(self):
         """Test the write method (file-like interface)"""
-        callback = MagicMock()
-        self.streamer.register_callback(callback)
+        calls = []
+        self.streamer.register_callback(calls.append)
 
-        # Write some text
+        # Write some text; without a newline it stays pending until flushed
         self.streamer.write("Test output")
+        self.streamer.flush()
 
         # Callback should have been called
-        callback.assert_called_once_with("Test output")
+        self.assertEqual(calls, ["Test output"])
+
+    def test_write_coalesces_until_newline(self):
+        """Test writes are broadcast as one chunk once a newline arrives"""
+        calls = []
+        self.streamer.register_callback(calls.append)
+
+        with patch("sys.stdout", StringIO()):
+            self.streamer.write("Line")
+            self.streamer.write(" 1")
+            self.assertEqual(calls, [])
+            self.streamer.write("\n")
+
+        self.assertEqual(calls, ["Line 1\n"])
+
+    def test_write_flushes_at_flush_size(self):
+        """Test a long partial line is broadcast once it reaches flush_size"""
+        streamer = TerminalStreamer(flush_size=4, flush_delay=60)
+        calls = []
+        streamer.register_callback(calls.append)
+
+        with patch("sys.stdout", StringIO()):
+            streamer.write("ab")
+            self.assertEqual(calls, [])
+            streamer.write("cd")
+
+        self.assertEqual(calls, ["abcd"])
+
+    def test_partial_line_sent_on_flush(self):
+        """Test a partial line is held until flush()"""
+        calls = []
+        self.streamer.register_callback(calls.append)
+
+        with patch("sys.stdout", StringIO()):
+            self.streamer.write("Prompt> ")
+            self.assertEqual(calls, [])
+            self.streamer.flush()
+
+        self.assertEqual(calls, ["Prompt> "])
+
+    def test_partial_line_flushed_when_idle(self):
+        """Test a partial line is broadcast once it has been pending for the flush delay"""
+        streamer = TerminalStreamer(flush_delay=0.01)
+        received = []
+        done = threading.Event()
+
+        def callback(text):
+            received.append(text)
+            done.set()
+
+        streamer.register_callback(callback)
+        with patch("sys.stdout", StringIO()):
+            streamer.write("Prompt> ")
+
+        self.assertTrue(done.wait(timeout=5.0))
+        self.assertEqual(received, ["Prompt> "])
+
+    def test_carriage_return_flushes(self):
+        """Test a progress update ending in a carriage return is broadcast at once"""
+        calls = []
+        self.streamer.register_callback(calls.append)
+
+        with patch("sys.stdout", StringIO()):
+            self.streamer.write("Progress 50%")
+            self.streamer.write("\r")
+
+        self.assertEqual(calls, ["Progress 50%\r"])
 
     def test_capture_stdout(self):
         """Test capturing stdout"""
         captured_output = []
-        
-        def callback(text):
-            captured_output.append(text)
-        
-        self.streamer.register_callback(callback)
+        self.streamer.register_callback(captured_output.append)
 
         # Start capturing
         self.streamer.start_capture()
@@ -123,14 +247,44 @@ class TestTerminalStreamer(unittest.TestCase):
         output = "".join(captured_output)
         self.assertEqual(output, "Test message")
 
+    def test_capture_installs_text_stream(self):
+        """Test capture replaces stdout with a text stream that mirrors the original"""
+        original = StringIO()
+        with patch("sys.stdout", original):
+            self.streamer.start_capture()
+            try:
+                captured_stdout = sys.stdout
+                self.assertIsInstance(captured_stdout, TextIOBase)
+                self.assertTrue(captured_stdout.writable())
+                self.assertFalse(captured_stdout.isatty())
+                self.assertEqual(captured_stdout.write("abc"), 3)
+            finally:
+                self.streamer.stop_capture()
+            self.assertIs(sys.stdout, original)
+
+        self.assertEqual(original.getvalue(), "abc")
+
+    def test_capture_isatty_without_original_isatty(self):
+        """Test isatty() is False when the replaced stream has no isatty()"""
+        class WriteOnly:
+            def write(self, text):
+                return len(text)
+
+            def flush(self):
+                pass
+
+        with patch("sys.stdout", WriteOnly()), patch("sys.stderr", WriteOnly()):
+            self.streamer.start_capture()
+            try:
+                self.assertFalse(sys.stdout.isatty())
+                self.assertFalse(sys.stderr.isatty())
+            finally:
+                self.streamer.stop_capture()
+
     def test_context_manager(self):
         """Test the TerminalOutputCapture context manager"""
         captured_output = []
-        
-        def callback(text):
-            captured_output.append(text)
-        
-        self.streamer.register_callback(callback)
+        self.streamer.register_callback(captured_output.append)
 
         # Use context manager
         with TerminalOutputCapture(self.streamer):
@@ -146,11 +300,7 @@ class TestTerminalStreamer(unittest.TestCase):
     def test_multiple_start_stop(self):
         """Test multiple start/stop cycles"""
         captured_output = []
-        
-        def callback(text):
-            captured_output.append(text)
-        
-        self.streamer.register_callback(callback)
+        self.streamer.register_callback(captured_output.append)
 
         # First cycle
         self.streamer.start_capture()
@@ -197,23 +347,25 @@ class TestTerminalStreamer(unittest.TestCase):
         self.assertEqual(len(callbacks_called), 10)
 
 
-class TestWebSocketServer(unittest.TestCase):
+class TestWebSocketServer(unittest.IsolatedAsyncioTestCase):
     """Test the WebSocket server functionality"""
 
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         """Set up test fixtures"""
-        # Mock websockets to avoid import errors in test environment
-        self.websockets_mock = MagicMock()
-        sys.modules['websockets'] = self.websockets_mock
-        sys.modules['websockets.server'] = MagicMock()
-
-    def tearDown(self):
+        # Mock websockets once for the whole class to avoid import errors in
+        # test environment; stopping the patch also drops the server module
+        # imported against the mock
+        cls._modules_patcher = patch.dict(sys.modules, {
+            'websockets': MagicMock(),
+            'websockets.server': MagicMock(),
+        })
+        cls._modules_patcher.start()
+
+    @classmethod
+    def tearDownClass(cls):
         """Clean up after tests"""
-        # Remove mocked modules
-        if 'websockets' in sys.modules:
-            del sys.modules['websockets']
-        if 'websockets.server' in sys.modules:
-            del sys.modules['websockets.server']
+        cls._modules_patcher.stop()
 
     def test_server_initialization(self):
         """Test WebSocket server initialization"""
@@ -237,80 +389,133 @@ class TestWebSocketServer(unittest.TestCase):
             # If import fails even with mocks, skip test
             self.skipTest("websockets module not available")
 
-    def test_broadcast_message_format(self):
+    async def test_broadcast_message_format(self):
         """Test that broadcast messages are properly formatted"""
         try:
             # noqa: PLC0415 - Import inside function for conditional testing
             from examples.websocket_terminal_server import (  # noqa: PLC0415
                 WebSocketTerminalServer,
             )
-            
-            server = WebSocketTerminalServer()
-            
-            # Mock a client
-            mock_client = MagicMock()
-            server.clients.add(mock_client)
-            
-            # Broadcast some text through the streamer
-            test_text = "Test output\n"
-            server.streamer.broadcast(test_text)
-            
-            # Give async tasks a moment to process
-            time.sleep(0.1)
-            
-            # Note: Full verification would require async test framework
-            # This test verifies the structure is correct
         except ImportError:
             self.skipTest("websockets module not available")
 
+        server = WebSocketTerminalServer()
+        server.loop = asyncio.get_running_loop()
 
-class TestTerminalStreamerIntegration(unittest.TestCase):
-    """Integration tests for terminal streaming"""
+        # Mock a client
+        mock_client = AsyncMock()
+        queue = server._register_client(mock_client)
 
-    def test_capture_multiline_output(self):
-        """Test capturing multiple lines of output"""
-        streamer = TerminalStreamer()
-        captured = []
+        # Broadcast some text through the streamer
+        test_text = "Test output\n"
+        server.streamer.broadcast(test_text)
 
-        def capture_callback(text):
-            captured.append(text)
+        # One loop turn runs the thread-safe enqueue, then wait for the send
+        await asyncio.sleep(0)
+        await queue.join()
+        server._unregister_client(mock_client)
 
-        streamer.register_callback(capture_callback)
-        streamer.start_capture()
+        (message,), _ = mock_client.send.call_args
+        self.assertEqual(json.loads(message), {"type": "output", "data": test_text})
 
-        # Print multiple lines
-        print("Line 1")
-        print("Line 2")
-        print("Line 3")
+    async def test_sender_drops_failed_clients(self):
+        """Test queued broadcasts reach healthy clients and failing ones are closed"""
+        try:
+            from examples.websocket_terminal_server import (  # noqa: PLC0415
+                WebSocketTerminalServer,
+            )
+        except ImportError:
+            self.skipTest("websockets module not available")
 
-        streamer.stop_capture()
+        server = WebSocketTerminalServer()
+        healthy = AsyncMock()
+        closed = AsyncMock()
+        closed.send.side_effect = ConnectionError("closed")
+
+        queues = [server._register_client(healthy), server._register_client(closed)]
+        server._enqueue_broadcast("payload")
+        for queue in queues:
+            await queue.join()
+        self.assertEqual(server.clients, {healthy})
+        server._unregister_client(healthy)
+
+        healthy.send.assert_awaited_once_with("payload")
+        healthy.close.assert_not_awaited()
+        closed.close.assert_awaited_once_with()
+        self.assertEqual(server.clients, set())
+        self.assertEqual(server._client_queues, {})
+        self.assertEqual(server._sender_tasks, {})
+
+    async def test_full_queue_drops_oldest(self):
+        """Test a full client queue keeps only the newest messages"""
+        try:
+            from examples.websocket_terminal_server import (  # noqa: PLC0415
+                WebSocketTerminalServer,
+            )
+        except ImportError:
+            self.skipTest("websockets module not available")
 
-        # Should have captured all lines (including newlines)
-        output = "".join(captured)
-        self.assertIn("Line 1", output)
-        self.assertIn("Line 2", output)
-        self.assertIn("Line 3", output)
+        queue = asyncio.Queue(maxsize=3)
+        for i in range(5):
+            WebSocketTerminalServer._put_drop_oldest(queue, f"msg {i}")
+        self.assertEqual(
+            [queue.get_nowait() for _ in range(queue.qsize())], ["msg 2", "msg 3", "msg 4"]
+        )
 
-    def test_capture_preserves_formatting(self):
-        """Test that captured output preserves formatting"""
-        streamer = TerminalStreamer()
-        captured = []
+    async def test_sender_preserves_order_per_client(self):
+        """Test each client receives queued broadcasts in order"""
+        try:
+            from examples.websocket_terminal_server import (  # noqa: PLC0415
+                WebSocketTerminalServer,
+            )
+        except ImportError:
+            self.skipTest("websockets module not available")
 
-        def capture_callback(text):
-            captured.append(text)
+        server = WebSocketTerminalServer()
+        clients = [AsyncMock() for _ in range(3)]
+
+        queues = []
+        for client in clients:
+            queues.append(server._register_client(client))
+            self.addCleanup(server._unregister_client, client)
+        server._enqueue_broadcast("first")
+        server._enqueue_broadcast("second")
+        for queue in queues:
+            await queue.join()
+
+        for client in clients:
+            self.assertEqual(
+                [c.args for c in client.send.await_args_list], [("first",), ("second",)]
+            )
 
-        streamer.register_callback(capture_callback)
-        streamer.start_capture()
 
-        # Print with tabs and spaces
-        print("Column1\tColumn2\tColumn3")
-        print("  Indented text")
+class TestTerminalStreamerIntegration(unittest.TestCase):
+    """Integration tests for terminal streaming"""
 
-        streamer.stop_capture()
+    def test_capture_scenarios(self):
+        """Test captured output keeps every line and its formatting"""
+        scenarios = [
+            # Multiple lines, including newlines
+            ("multiline", ["Line 1", "Line 2", "Line 3"]),
+            # Tabs and leading spaces
+            ("formatting", ["Column1\tColumn2\tColumn3", "  Indented text"]),
+        ]
+        streamer = TerminalStreamer()
 
-        output = "".join(captured)
-        self.assertIn("\t", output)
-        self.assertIn("  Indented", output)
+        for name, lines in scenarios:
+            with self.subTest(name=name):
+                # Collect chunks in one growing buffer instead of joining a list
+                captured = StringIO()
+                streamer.register_callback(captured.write)
+                streamer.start_capture()
+                try:
+                    for line in lines:
+                        print(line)
+                finally:
+                    streamer.stop_capture()
+                    streamer.unregister_callback(captured.write)
+
+                self.assertEqual(captured.getvalue(), "".join(f"{line}\n" for line in lines))
 
 
 if __name__ == "__main__":